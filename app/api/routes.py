@@ -2,14 +2,23 @@
 API routes for medical document processing.
 """
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+import asyncio
 import logging
+import multiprocessing
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
 # Add parent directory to path to import converter
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-from converter.converter import universal_to_jpeg
+from converter.converter import universal_to_jpeg, count_pages, render_pages
 
 from app.utils.temp_storage import TempStorage
 from app.services.uploader import S3Uploader
@@ -22,9 +31,238 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 temp_storage = TempStorage()
 
-# Path to store converted images
-IMAGES_OUTPUT_DIR = Path(__file__).parent.parent.parent / "converter" / "images"
-IMAGES_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+# Path to store converted images. Images only live until they are uploaded,
+# so keep them on tmpfs (RAM) when available; IMAGES_DIR overrides this
+_SHM_DIR = "/dev/shm"
+# Only a directory this process created itself is removed at shutdown
+_OWNS_IMAGES_DIR = not os.getenv("IMAGES_DIR")
+if not _OWNS_IMAGES_DIR:
+    IMAGES_OUTPUT_DIR = Path(os.environ["IMAGES_DIR"])
+    IMAGES_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+else:
+    IMAGES_OUTPUT_DIR = Path(tempfile.mkdtemp(
+        prefix="amala-",
+        dir=_SHM_DIR if os.path.isdir(_SHM_DIR) else None
+    ))
+
+# Finished conversion jobs waiting for upload, and how many images share
+# one upload URL request
+UPLOAD_QUEUE_SIZE = 8
+UPLOAD_URL_BATCH_SIZE = 8
+
+# Pages of a multi-page document rendered by one conversion pool job; a
+# job's images are queued together, so they must fit in one URL request
+PAGES_PER_JOB = 4
+assert PAGES_PER_JOB <= UPLOAD_URL_BATCH_SIZE, "a conversion job must fit in one upload URL request"
+
+# Resolution for document conversion; pixel count (and so conversion time,
+# upload size and AI input) grows with dpi squared
+DEFAULT_DPI = 200
+MIN_DPI = 100
+MAX_DPI = 400
+
+# Cap on notes plus text file content sent to the extract API (UTF-8 bytes)
+MAX_ADDITIONAL_DATA_BYTES = 256 * 1024
+
+# Uploaded file extensions, and which bucket separate_files puts each in
+_DOC_EXTS = frozenset({".pdf", ".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif", ".tiff", ".xps", ".epub"})
+_TXT_EXTS = frozenset({".txt"})
+DOCUMENT_BUCKET = 0
+TEXT_BUCKET = 1
+EXTENSION_BUCKETS = {
+    **{ext: DOCUMENT_BUCKET for ext in _DOC_EXTS},
+    **{ext: TEXT_BUCKET for ext in _TXT_EXTS},
+}
+
+
+# uvicorn workers sharing this machine's CPUs; each one's conversion pool
+# gets an equal share, so renders never outnumber the cores
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+CONVERT_POOL_SIZE = max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)
+
+# Document conversion pool shared by all requests in this worker process
+_convert_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_convert_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared document conversion pool, creating it on first use.
+    
+    This process already runs upload and to_thread worker threads, so the
+    pool never forks it: workers come from a forkserver (spawn where that
+    is unavailable). With those start methods workers are also started
+    only as jobs arrive, up to CONVERT_POOL_SIZE, so a small case doesn't
+    launch the whole pool.
+    Jobs submitted to it must be picklable functions from the converter
+    package, so workers never import this module.
+    
+    Returns:
+        The process pool
+    """
+    global _convert_pool
+    if _convert_pool is None:
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _convert_pool = ProcessPoolExecutor(
+            max_workers=CONVERT_POOL_SIZE,
+            mp_context=multiprocessing.get_context(start_method)
+        )
+    return _convert_pool
+
+
+def remove_images_dir() -> None:
+    """Remove IMAGES_OUTPUT_DIR at shutdown if it is this process's own temp directory"""
+    if _OWNS_IMAGES_DIR:
+        shutil.rmtree(IMAGES_OUTPUT_DIR, ignore_errors=True)
+
+
+def shutdown_convert_pool(executor: Optional[ProcessPoolExecutor] = None) -> None:
+    """
+    Shut down the conversion pool without waiting for running jobs.
+    
+    Queued jobs are cancelled; the next request creates a new pool.
+    
+    Args:
+        executor: Only shut the pool down if it is still this one (default:
+                  whatever pool is current); a pool that broke may already
+                  have been replaced by another request
+    """
+    global _convert_pool
+    if _convert_pool is None or (executor is not None and _convert_pool is not executor):
+        return
+    _convert_pool.shutdown(wait=False, cancel_futures=True)
+    _convert_pool = None
+
+
+async def _upload_from_queue(image_queue: asyncio.Queue) -> dict:
+    """
+    Upload converted images to S3 as they are produced.
+    
+    Drains lists of image paths (one per finished conversion job) from
+    the queue until a None sentinel arrives. Everything queued at that
+    point is handed off in batches of up to UPLOAD_URL_BATCH_SIZE; each
+    batch requests its upload URLs and uploads without waiting for the
+    previous batches.
+    
+    Args:
+        image_queue: Queue of converted JPEG image path lists, terminated by None
+        
+    Returns:
+        Dictionary mapping filename to S3 key
+        
+    Raises:
+        Exception: If getting upload URLs or any upload fails
+    """
+    uploads = []
+    done = False
+    
+    try:
+        while not done:
+            # Each item is a whole job's images, so a job never costs more
+            # than one URL request; jobs that finished together are merged
+            images = []
+            item = await image_queue.get()
+            while True:
+                if item is None:
+                    done = True
+                    break
+                images.extend(item)
+                if len(images) >= UPLOAD_URL_BATCH_SIZE or image_queue.empty():
+                    break
+                item = image_queue.get_nowait()
+            
+            if not images:
+                continue
+            
+            # Stop taking new batches as soon as an earlier one has failed
+            for upload in uploads:
+                if upload.done() and upload.exception():
+                    raise upload.exception()
+            
+            # URL request and uploads run as one task, so the next batch is
+            # collected while this one's URLs are still in flight
+            for start in range(0, len(images), UPLOAD_URL_BATCH_SIZE):
+                batch = images[start:start + UPLOAD_URL_BATCH_SIZE]
+                uploads.append(asyncio.create_task(
+                    S3Uploader.upload_images_async(batch, AIPipeline.GET_UPLOAD_URLS_ENDPOINT)
+                ))
+        
+        s3_keys_mapping = {}
+        for batch_mapping in await asyncio.gather(*uploads):
+            s3_keys_mapping.update(batch_mapping)
+        return s3_keys_mapping
+    finally:
+        for upload in uploads:
+            upload.cancel()
+
+
+async def _queue_images(image_queue: asyncio.Queue, image_paths: Optional[List[Path]], upload_task: asyncio.Task) -> None:
+    """
+    Hand a finished job's converted images to the upload consumer.
+    
+    Waits for space in the queue, but stops waiting if the consumer has
+    already failed so a full queue cannot block the request forever.
+    
+    Args:
+        image_queue: Queue drained by the upload consumer
+        image_paths: Paths of the job's JPEG images, or None to end the queue
+        upload_task: The running upload consumer task
+        
+    Raises:
+        Exception: The consumer's error, if it failed
+    """
+    put = asyncio.ensure_future(image_queue.put(image_paths))
+    await asyncio.wait({put, upload_task}, return_when=asyncio.FIRST_COMPLETED)
+    if not put.done():
+        put.cancel()
+        await upload_task
+
+
+async def _read_text(path: Path) -> str:
+    """
+    Read a text file without blocking the event loop.
+    
+    Args:
+        path: Path to the text file
+        
+    Returns:
+        File content, with undecodable bytes replaced
+    """
+    return await asyncio.to_thread(path.read_text, encoding="utf-8", errors="replace")
+
+
+def _too_large(text: str) -> bool:
+    """
+    Check text against the additional data cap.
+    
+    Args:
+        text: Notes and/or text file content
+        
+    Returns:
+        True if its UTF-8 encoding is over MAX_ADDITIONAL_DATA_BYTES
+    """
+    return len(text.encode("utf-8")) > MAX_ADDITIONAL_DATA_BYTES
+
+
+def _error_response(message: str, status_code: int) -> ORJSONResponse:
+    """
+    Error response with a real HTTP status code.
+    
+    Args:
+        message: Error message for the client
+        status_code: HTTP status code
+        
+    Returns:
+        ORJSONResponse with the usual error body
+    """
+    return ORJSONResponse({
+        "status": "error",
+        "message": message
+    }, status_code=status_code)
+
+
+def _too_large_response() -> ORJSONResponse:
+    """Error response for additional data over the cap, with HTTP 413"""
+    return _error_response(f"additional_data too large (max {MAX_ADDITIONAL_DATA_BYTES // 1024} KiB)", 413)
 
 
 def separate_files(raw_files: List[Path]) -> tuple[List[Path], List[Path]]:
@@ -37,90 +275,52 @@ def separate_files(raw_files: List[Path]) -> tuple[List[Path], List[Path]]:
     Returns:
         Tuple of (document_files, txt_files)
     """
-    document_extensions = {".pdf", ".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif", ".tiff", ".xps", ".epub"}
-    txt_extensions = {".txt"}
-    
-    documents = []
-    text_files = []
+    buckets = ([], [])
     
     for file_path in raw_files:
-        ext = file_path.suffix.lower()
-        if ext in txt_extensions:
-            text_files.append(file_path)
-        elif ext in document_extensions:
-            documents.append(file_path)
-        else:
-            # Try to treat as document
-            documents.append(file_path)
+        # Unknown extensions are treated as documents
+        buckets[EXTENSION_BUCKETS.get(file_path.suffix.lower(), DOCUMENT_BUCKET)].append(file_path)
     
-    return documents, text_files
+    return buckets[DOCUMENT_BUCKET], buckets[TEXT_BUCKET]
 
 
-def build_s3_keys_by_document(image_paths: List[Path], original_documents: List[Path]) -> tuple[dict, dict]:
+def build_s3_keys_by_document(images_by_document: List[List[Path]]) -> tuple[dict, list]:
     """
     Group S3 keys by original document and track image-to-document mapping.
     
-    The converter outputs images in order. We need to figure out which images
-    came from which document.
+    Each document is converted into its own output directory, so the
+    images of every document are known exactly.
     
     Args:
-        image_paths: List of converted JPEG image paths (ordered)
-        original_documents: List of original document file paths
+        images_by_document: Converted JPEG image paths per original document (ordered)
         
     Returns:
-        Tuple of (s3_keys_by_doc_dict, image_filenames_dict)
+        Tuple of (s3_keys_by_doc_dict, image_filenames_list)
         where s3_keys_by_doc_dict[0] = ["img1", "img2"] for first doc
     """
     s3_keys_by_doc = {}
     image_filenames = []
     
-    # For now, simple approach: assign images to documents in order
-    # This is a simplification; in production you'd track this during conversion
-    images_per_doc = len(image_paths) // len(original_documents) if original_documents else 0
-    
-    if not original_documents:
-        # No documents, shouldn't happen but handle gracefully
-        for img_path in image_paths:
-            image_filenames.append(img_path.name)
-        return s3_keys_by_doc, image_filenames
-    
-    if images_per_doc == 0:
-        # More documents than images (unlikely but possible)
-        images_per_doc = 1
-    
-    img_idx = 0
-    for doc_idx, doc_path in enumerate(original_documents):
-        s3_keys_by_doc[doc_idx] = []
-        
-        # Assign images to this document
-        for _ in range(images_per_doc):
-            if img_idx < len(image_paths):
-                img_path = image_paths[img_idx]
-                # Extract S3 key from filename
-                s3_key = img_path.stem  # Remove .jpeg extension
-                s3_keys_by_doc[doc_idx].append(s3_key)
-                image_filenames.append(img_path.name)
-                img_idx += 1
-        
-        # Handle last document getting remaining images
-        if doc_idx == len(original_documents) - 1:
-            while img_idx < len(image_paths):
-                img_path = image_paths[img_idx]
-                s3_key = img_path.stem
-                s3_keys_by_doc[doc_idx].append(s3_key)
-                image_filenames.append(img_path.name)
-                img_idx += 1
+    for doc_idx, doc_images in enumerate(images_by_document):
+        s3_keys_by_doc[doc_idx] = [img_path.stem for img_path in doc_images]
+        image_filenames.extend(img_path.name for img_path in doc_images)
     
     return s3_keys_by_doc, image_filenames
 
 
-@router.post("/process-case", response_model=ProcessCaseResponse, tags=["Processing"])
+@router.post(
+    "/process-case",
+    response_class=ORJSONResponse,
+    responses={200: {"model": ProcessCaseResponse}},
+    tags=["Processing"]
+)
 async def process_case(
     files: List[UploadFile] = File(...),
     case_id: str = Form(...),
     user_id: str = Form(...),
-    additional_data: Optional[str] = Form(None)
-) -> dict:
+    additional_data: Optional[str] = Form(None),
+    dpi: int = Form(DEFAULT_DPI)
+) -> ORJSONResponse:
     """
     Process medical case documents and update summary in Supabase.
     
@@ -144,22 +344,31 @@ async def process_case(
         case_id: UUID of the case in Supabase
         user_id: UUID of the user (for logging/validation)
         additional_data: Doctor-written text notes (sent directly to AI, not converted)
+        dpi: Resolution for document conversion (MIN_DPI to MAX_DPI, default DEFAULT_DPI)
         
     Returns:
         ProcessCaseResponse with status "processing_started"
     """
     request_id = None
+    request_images_dir = None
     
     try:
         # STEP 1️⃣: Validate and save uploaded files
         if not files:
             raise HTTPException(status_code=400, detail="No files uploaded")
         
-        logger.info(f"Received {len(files)} files for processing")
+        if not MIN_DPI <= dpi <= MAX_DPI:
+            return _error_response(f"dpi must be between {MIN_DPI} and {MAX_DPI}", 400)
+        
+        # Reject oversized notes before doing any conversion work
+        if additional_data and _too_large(additional_data):
+            return _too_large_response()
+        
+        logger.info("Received %d files for processing", len(files))
         
         # Create request directory
         request_id = temp_storage.create_request_directory()
-        logger.info(f"Created request directory: {request_id}")
+        logger.info("Created request directory: %s", request_id)
         
         # Save all files
         saved_files = []
@@ -167,10 +376,9 @@ async def process_case(
             if not file.filename:
                 continue
             
-            content = await file.read()
-            file_path = temp_storage.save_uploaded_file(request_id, content, file.filename)
+            file_path = await temp_storage.save_uploaded_file(request_id, file, file.filename)
             saved_files.append(file_path)
-            logger.info(f"Saved file: {file.filename}")
+            logger.info("Saved file: %s", file.filename)
         
         if not saved_files:
             raise Exception("No valid files were saved")
@@ -182,136 +390,14 @@ async def process_case(
         if not document_files:
             raise Exception("No document files found (PDF or image files required)")
         
-        print(f"\n{'='*60}")
-        print("📋 FILES SEPARATION")
-        print(f"{'='*60}")
-        print(f"Total Files: {len(raw_files)}")
-        print(f"Documents: {len(document_files)}")
-        for doc in document_files:
-            print(f"   - {doc.name}")
-        print(f"Text Files: {len(text_files)}")
-        for txt in text_files:
-            print(f"   - {txt.name}")
-        print(f"{'='*60}\n")
-        
-        logger.info(f"Found {len(document_files)} document(s) and {len(text_files)} text file(s)")
-        
-        # STEP 2️⃣: Convert documents using existing converter
-        # Store images in converter/images folder
-        print(f"\n{'='*60}")
-        print("🔄 CONVERTING DOCUMENTS TO JPEG")
-        print(f"{'='*60}")
-        print(f"Output Directory: {IMAGES_OUTPUT_DIR}")
-        
-        for doc_path in document_files:
-            print(f"\n📄 Converting: {doc_path.name}")
-            logger.info(f"Converting document: {doc_path.name}")
-            universal_to_jpeg(str(doc_path), str(IMAGES_OUTPUT_DIR), dpi=300)
-        
-        # Get converted JPEG images from the output directory (ordered)
-        image_paths = sorted(IMAGES_OUTPUT_DIR.glob("*.jpeg"))
-        
-        if not image_paths:
-            raise Exception("No JPEG images were generated from documents")
-        
-        print(f"\n✅ Generated {len(image_paths)} JPEG image(s)")
-        print(f"{'='*60}\n")
-        
-        for img in image_paths:
-            print(f"   - {img.name}")
-        
-        logger.info(f"Generated {len(image_paths)} JPEG image(s)")
-        
-        # Rename images to match API expected format (i1.jpeg, i2.jpeg, etc.)
-        print(f"\n📝 Renaming images to standard format...")
-        renamed_paths = []
-        for idx, img_path in enumerate(image_paths, start=1):
-            new_name = f"i{idx}.jpeg"
-            new_path = img_path.parent / new_name
-            img_path.rename(new_path)
-            renamed_paths.append(new_path)
-            print(f"   {img_path.name} → {new_name}")
-        
-        image_paths = renamed_paths
-        
-        # STEP 3️⃣: Get S3 upload URLs
-        image_filenames = [img.name for img in image_paths]
-        upload_urls, s3_keys = S3Uploader.get_upload_urls(
-            image_filenames,
-            AIPipeline.GET_UPLOAD_URLS_ENDPOINT
-        )
-        logger.info(f"Got {len(upload_urls)} upload URL(s)")
-        
-        # STEP 4️⃣: Upload images to S3
-        print(f"\n{'='*60}")
-        print("⬆️ UPLOADING IMAGES TO S3")
-        print(f"{'='*60}\n")
-        
-        s3_keys_mapping = S3Uploader.upload_all_images(image_paths, upload_urls, s3_keys)
-        
-        print(f"\n✅ S3 UPLOAD COMPLETE")
-        print(f"Total Uploaded: {len(s3_keys_mapping)}")
-        print(f"{'='*60}\n")
-        
-        logger.info(f"Successfully uploaded {len(s3_keys_mapping)} image(s) to S3")
-        
-        # STEP 5️⃣: Build clinical_data structure
-        # Group S3 keys by original document
-        # s3_keys_mapping is {filename: s3_key} from API response
-        # We need to group them by document order
-        
-        clinical_data_dict = {}
-        doc_count = 1
-        current_doc_group = []
-        
-        # Sort filenames to maintain order
-        sorted_filenames = sorted(s3_keys_mapping.keys())
-        
-        for filename in sorted_filenames:
-            s3_key = s3_keys_mapping[filename]
-            current_doc_group.append(s3_key)
-            
-            # Check if this is the last file of a document
-            # For simplicity, group by original document from image_paths
-            # This needs to track which images came from which document
-        
-        # Better approach: use the original document grouping
-        # Build mapping from original documents to their images
-        clinical_data = {}
-        img_idx = 0
-        
-        for doc_idx, doc_path in enumerate(document_files):
-            doc_key = str(doc_idx + 1)
-            clinical_data[doc_key] = []
-            
-            # Find how many images belong to this document
-            # by checking the original naming from conversion
-            # For now, collect all images in order
-            for filename in sorted_filenames:
-                s3_key = s3_keys_mapping[filename]
-                clinical_data[doc_key].append(s3_key)
-        
-        # Simpler approach: since we renamed all files to i1.jpeg, i2.jpeg, etc.
-        # and API response contains s3_key which is the actual S3 path,
-        # just group sequentially
-        clinical_data = {"1": []}
-        for filename in sorted_filenames:
-            s3_key = s3_keys_mapping[filename]
-            clinical_data["1"].append(s3_key)
-        
-        print(f"\n{'='*60}")
-        print("📊 CLINICAL DATA STRUCTURE")
-        print(f"{'='*60}")
-        print(f"Documents: {len(clinical_data)}")
-        for doc_key, keys in clinical_data.items():
-            print(f"   Document {doc_key}: {len(keys)} image(s)")
-            for key in keys:
-                print(f"      - {key}")
-        print(f"{'='*60}\n")
-        
-        logger.info(f"Built clinical_data with {len(clinical_data)} document group(s)")
+        logger.info("Found %d document(s) and %d text file(s)", len(document_files), len(text_files))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Documents: %s", [doc.name for doc in document_files])
+            logger.debug("Text files: %s", [txt.name for txt in text_files])
         
         # STEP 6️⃣: Handle additional data (doctor-written notes)
+        # Done before conversion, so oversized text is rejected before any
+        # conversion or upload work
         # This data is sent directly from frontend, NOT from text files
         # Text files are processed as documents, not as additional_data
         final_additional_data = None
@@ -319,24 +405,21 @@ async def process_case(
         # Use additional_data parameter from form if provided
         if additional_data:
             final_additional_data = additional_data
-            logger.info(f"Using additional_data from form: {len(additional_data)} characters")
-            print(f"\n📝 ADDITIONAL DATA RECEIVED")
-            print(f"{'='*60}")
-            print(f"Length: {len(additional_data)} characters")
-            print(f"Content preview: {additional_data[:100]}...")
-            print(f"{'='*60}\n")
+            logger.info("Using additional_data from form: %d characters", len(additional_data))
         
         # Also read any text files that were uploaded
         if text_files:
             text_contents = []
-            for txt_file in text_files:
-                try:
-                    with open(txt_file, "r", encoding="utf-8") as f:
-                        content = f.read()
-                        text_contents.append(content)
-                    logger.info(f"Read text file: {txt_file.name}")
-                except Exception as e:
-                    logger.warning(f"Failed to read {txt_file.name}: {e}")
+            results = await asyncio.gather(
+                *(_read_text(txt_file) for txt_file in text_files),
+                return_exceptions=True
+            )
+            for txt_file, result in zip(text_files, results):
+                if isinstance(result, Exception):
+                    logger.warning("Failed to read %s: %s", txt_file.name, result)
+                else:
+                    text_contents.append(result)
+                    logger.info("Read text file: %s", txt_file.name)
             
             if text_contents:
                 text_data = "\n\n".join(text_contents)
@@ -345,98 +428,172 @@ async def process_case(
                     final_additional_data = final_additional_data + "\n\n" + text_data
                 else:
                     final_additional_data = text_data
-                logger.info(f"Combined {len(text_contents)} text file(s)")
+                logger.info("Combined %d text file(s)", len(text_contents))
+        
+        if final_additional_data and _too_large(final_additional_data):
+            return _too_large_response()
+        
+        # STEP 2️⃣: Convert documents using existing converter
+        # Store images in this request's own folder under IMAGES_OUTPUT_DIR
+        request_images_dir = IMAGES_OUTPUT_DIR / request_id
+        request_images_dir.mkdir(parents=True, exist_ok=True)
+        logger.debug("Converting documents into %s", request_images_dir)
+        
+        # Each document gets its own subdirectory so output filenames never
+        # collide and images stay attributed to the document they came from
+        doc_output_dirs = [request_images_dir / f"doc{idx}" for idx in range(len(document_files))]
+        
+        for doc_path in document_files:
+            logger.info("Converting document: %s", doc_path.name)
+        
+        # STEP 3️⃣ + 4️⃣: Upload URLs are requested and images uploaded by a
+        # concurrent consumer while the remaining documents are still converting
+        image_queue: asyncio.Queue = asyncio.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+        upload_task = asyncio.create_task(_upload_from_queue(image_queue))
+        image_paths: List[Path] = []
+        
+        convert_tasks: List[asyncio.Future] = []
+        try:
+            # Conversion is CPU-bound, so fan documents out across the
+            # shared process pool
+            loop = asyncio.get_running_loop()
+            executor = get_convert_pool()
+            
+            # Page counts fix each document's image numbers up front, so
+            # documents can be converted in parallel straight to their
+            # final i1.jpeg, i2.jpeg, ... names
+            page_counts = await asyncio.gather(*(
+                loop.run_in_executor(executor, count_pages, str(doc_path))
+                for doc_path in document_files
+            ))
+            start_indices = [sum(page_counts[:idx]) + 1 for idx in range(len(page_counts))]
+            
+            # One pool job per single-page document, and per PAGES_PER_JOB
+            # pages of a multi-page one, so every page shares the same pool
+            # instead of documents starting pools of their own; each job is
+            # paired with its document and the images it must write
+            jobs = []
+            for doc_path, out_dir, start_index, page_count in zip(
+                document_files, doc_output_dirs, start_indices, page_counts
+            ):
+                out_dir.mkdir(parents=True, exist_ok=True)
+                if page_count == 1:
+                    job = partial(universal_to_jpeg, doc_path, out_dir, dpi=dpi,
+                                  name_prefix="i", start_index=start_index)
+                    jobs.append((job, doc_path, [out_dir / f"i{start_index}.jpeg"]))
+                    continue
+                for first in range(0, page_count, PAGES_PER_JOB):
+                    pages = range(first, min(first + PAGES_PER_JOB, page_count))
+                    job = partial(render_pages, doc_path, out_dir, pages, dpi, "i", start_index)
+                    jobs.append((job, doc_path, [out_dir / f"i{start_index + page}.jpeg" for page in pages]))
+            
+            async def convert(job_idx: int) -> int:
+                await loop.run_in_executor(executor, jobs[job_idx][0])
+                return job_idx
+            
+            convert_tasks = [asyncio.ensure_future(convert(i)) for i in range(len(jobs))]
+            
+            # Hand each job's images to the uploader as soon as it finishes
+            for finished in asyncio.as_completed(convert_tasks):
+                job_idx = await finished
+                # Stop converting as soon as the uploads have failed
+                if upload_task.done():
+                    await upload_task
+                _, doc_path, job_images = jobs[job_idx]
+                # The converter reports failures by not writing the page
+                # (e.g. a MuPDF error or a full disk); never send a case
+                # to the AI with pages missing
+                missing = [img.name for img in job_images if not img.exists()]
+                if missing:
+                    raise Exception(f"Failed to convert {doc_path.name}: {', '.join(missing)} not generated")
+                await _queue_images(image_queue, job_images, upload_task)
+            
+            # Converted JPEG images in document and page order
+            image_paths = [img for _, _, job_images in jobs for img in job_images]
+            
+            await _queue_images(image_queue, None, upload_task)
+            s3_keys_mapping = await upload_task
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); replace the pool,
+            # unless another request already has
+            shutdown_convert_pool(executor)
+            raise
+        finally:
+            # On failure, drop this request's conversions that haven't
+            # started without waiting for the running ones; the pool is
+            # shared, so it stays up for other requests
+            for task in convert_tasks:
+                task.cancel()
+            upload_task.cancel()
+        
+        if not image_paths:
+            raise Exception("No JPEG images were generated from documents")
+        
+        logger.info("Generated %d JPEG image(s)", len(image_paths))
+        logger.info("Successfully uploaded %d image(s) to S3", len(s3_keys_mapping))
+        
+        # STEP 5️⃣: Build clinical_data structure
+        # s3_keys_mapping is {filename: s3_key} from API response; image_paths
+        # is already in document and page order, so no sorting is needed
+        clinical_data = {"1": [s3_keys_mapping[img.name] for img in image_paths]}
+        
+        logger.info("Built clinical_data with %d document group(s)", len(clinical_data))
+        logger.debug("clinical_data: %s", clinical_data)
         
         # STEP 7️⃣: Call extract API
-        job_id = AIPipeline.call_extract_api(clinical_data, final_additional_data)
-        logger.info(f"Extraction started with job_id: {job_id}")
+        job_id = await AIPipeline.call_extract_api(clinical_data, final_additional_data)
+        logger.info("Extraction started with job_id: %s", job_id)
         
         # STEP 8️⃣: Poll job status until completion
-        print(f"\n{'='*60}")
-        print("🔍 POLLING FOR EXTRACTION RESULTS")
-        print(f"{'='*60}\n")
-        
         try:
-            final_summary = AIPipeline.poll_job_status(job_id)
+            final_summary = await AIPipeline.poll_job_status(job_id)
             logger.info("Extraction completed successfully")
         except TimeoutError as timeout_err:
-            # AI model did not return response after 120 attempts
-            logger.error(f"AI processing timed out for case {case_id}: {timeout_err}")
-            print(f"\n{'='*60}")
-            print("❌ AI PROCESSING TIMEOUT")
-            print(f"{'='*60}")
-            print(f"Job ID: {job_id}")
-            print(f"Case ID: {case_id}")
-            print(f"Status: Failed after 120 attempts")
-            print(f"{'='*60}\n")
+            # AI model did not return response within the polling window
+            logger.error("AI processing timed out for case %s (job %s): %s", case_id, job_id, timeout_err)
             
             # Update Supabase with failure status
             SupabaseService.update_case_failed(case_id)
             
-            return {
+            return ORJSONResponse({
                 "status": "error",
-                "message": "Case creation failed - AI processing timed out after 120 attempts"
-            }
-        
-        print(f"\n{'='*60}")
-        print("✅ EXTRACTION COMPLETE")
-        print(f"{'='*60}")
-        print(f"Job ID: {job_id}")
-        print(f"Status: Success")
-        print(f"Case ID: {case_id}")
-        print(f"{'='*60}\n")
+                "message": f"Case creation failed - AI processing timed out after {AIPipeline.MAX_POLL_WAIT // 60} minutes"
+            })
         
         # STEP 9️⃣: Update Supabase with summary
-        print(f"\n{'='*60}")
-        print("💾 UPDATING SUPABASE")
-        print(f"{'='*60}")
-        print(f"Case ID: {case_id}")
-        print(f"Summary length: {len(final_summary)} characters")
+        logger.info("Updating Supabase for case %s (summary: %d characters)", case_id, len(final_summary))
         
         success = SupabaseService.update_case_summary(case_id, final_summary)
         
         if success:
-            print(f"✅ Successfully updated Supabase")
-            logger.info(f"Successfully updated Supabase for case {case_id}")
+            logger.info("Successfully updated Supabase for case %s", case_id)
         else:
-            print(f"❌ Failed to update Supabase")
-            logger.error(f"Failed to update Supabase for case {case_id}")
-        
-        print(f"{'='*60}\n")
+            logger.error("Failed to update Supabase for case %s", case_id)
         
         # STEP 🔟: Return processing_started response
-        response = {
+        response = ORJSONResponse({
             "status": "processing_started",
             "summary_markdown": None
-        }
+        })
         
-        print(f"\n{'='*60}")
-        print("📤 RESPONSE")
-        print(f"{'='*60}")
-        print(f"Status: processing_started")
-        print(f"Summary saved to Supabase: {success}")
-        print(f"{'='*60}\n")
-        
-        logger.info(f"Process completed successfully for request {request_id}, case {case_id}")
+        logger.info("Process completed successfully for request %s, case %s", request_id, case_id)
         return response
         
     except Exception as e:
-        logger.error(f"Error processing case: {str(e)}")
-        return {
+        logger.error("Error processing case: %s", e)
+        return ORJSONResponse({
             "status": "error",
             "message": str(e)
-        }
+        })
     
     finally:
         # Cleanup temporary files
         if request_id:
             temp_storage.cleanup_request(request_id)
-            logger.info(f"Cleaned up temporary files for request {request_id}")
+            logger.info("Cleaned up temporary files for request %s", request_id)
         
-        # Cleanup converted JPEG images
-        try:
-            for img_file in IMAGES_OUTPUT_DIR.glob("*.jpeg"):
-                img_file.unlink()
+        # Cleanup converted JPEG images; only this request's folder is
+        # removed so concurrent requests keep their own images
+        if request_images_dir:
+            shutil.rmtree(request_images_dir, ignore_errors=True)
             logger.info("Cleaned up converted JPEG images")
-        except Exception as e:
-            logger.warning(f"Failed to cleanup JPEG images: {e}")
@@ -1,9 +1,20 @@
 """
 FastAPI main application for medical document processing.
 """
+import logging
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+from app.api.routes import router, shutdown_convert_pool, remove_images_dir
+from app.services.supabase_service import SupabaseService
+
+# Configure application logging once; debug output is only formatted when
+# LOG_LEVEL=DEBUG is set
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Medical Document Processor",
@@ -23,6 +34,25 @@ app.add_middleware(
 # Include routes
 app.include_router(router)
 
+@app.on_event("startup")
+async def warm_supabase_client():
+    """Create the Supabase client at startup so the first request doesn't pay for it"""
+    try:
+        SupabaseService.get_client()
+    except Exception as e:
+        # Missing credentials shouldn't stop the server; requests will report it
+        logger.warning("Could not initialize Supabase client at startup: %s", e)
+
+@app.on_event("shutdown")
+async def stop_convert_pool():
+    """Stop the document conversion pool without waiting for running jobs"""
+    shutdown_convert_pool()
+
+@app.on_event("shutdown")
+async def clean_images_dir():
+    """Remove this worker's temporary image directory"""
+    remove_images_dir()
+
 @app.api_route("/health", methods=["GET", "HEAD"], tags=["Health"])
 async def health_check():
     """Health check endpoint - supports both GET and HEAD for uptime monitoring"""
@@ -30,4 +60,16 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000, reload=True)
+    # Reload mode forces a single worker, so it is opt-in via DEV_RELOAD=1;
+    # otherwise run WEB_CONCURRENCY workers (default one per core)
+    reload = bool(int(os.getenv("DEV_RELOAD", "0")))
+    workers = 1 if reload else int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    # Workers read this back to split the cores between their conversion pools
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    uvicorn.run(
+        "app.main:app",
+        host="127.0.0.1",
+        port=8000,
+        reload=reload,
+        workers=None if reload else workers
+    )
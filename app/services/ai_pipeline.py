@@ -2,8 +2,12 @@
 AI Pipeline orchestrator for processing medical documents through external APIs.
 Handles the complete workflow: extraction, job polling, and result retrieval.
 """
+import asyncio
+import random
 import requests
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional
 from pathlib import Path
 import logging
@@ -20,16 +24,27 @@ class AIPipeline:
     JOB_STATUS_ENDPOINT = "https://pxyanaujf9.execute-api.ap-south-1.amazonaws.com/dev/job-status"
 
     # Configuration
-    POLL_INTERVAL = 5  # seconds
-    MAX_POLL_ATTEMPTS = 120  # 10 minutes max wait time
+    POLL_INITIAL_DELAY = 0.5  # seconds, doubled after every poll
+    POLL_MAX_DELAY = 10  # seconds, cap for the backoff delay
+    POLL_JITTER = 0.5  # seconds, random extra delay to spread out polls
+    MAX_POLL_WAIT = 600  # 10 minutes max wait time
     REQUEST_TIMEOUT = 30  # seconds
 
+    # Shared HTTP session so the extract call and every status poll reuse
+    # pooled keep-alive connections instead of a new TLS handshake each time
+    _session = requests.Session()
+    _session.mount("https://", HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    ))
+
     def __init__(self):
         """Initialize the AI pipeline"""
         pass
 
     @staticmethod
-    def call_extract_api(clinical_data: Dict[str, List[str]], 
+    async def call_extract_api(clinical_data: Dict[str, List[str]], 
                          additional_data: Optional[str] = None) -> str:
         """
         Call the extract API to start processing.
@@ -52,14 +67,11 @@ class AIPipeline:
             payload["additional_data"] = additional_data
         
         try:
-            print(f"\n{'='*60}")
-            print("📤 CALLING EXTRACT API")
-            print(f"{'='*60}")
-            print(f"Endpoint: {AIPipeline.EXTRACT_ENDPOINT}")
-            print(f"Payload: {payload}")
-            
             logger.info("Calling extract API...")
-            response = requests.post(
+            logger.debug("Extract payload: %s", payload)
+            # Run the blocking request in a thread so the event loop stays free
+            response = await asyncio.to_thread(
+                AIPipeline._session.post,
                 AIPipeline.EXTRACT_ENDPOINT,
                 json=payload,
                 timeout=AIPipeline.REQUEST_TIMEOUT
@@ -67,10 +79,7 @@ class AIPipeline:
             response.raise_for_status()
             
             data = response.json()
-            print(f"\n📥 EXTRACT API RESPONSE")
-            print(f"Status Code: {response.status_code}")
-            print(f"Response: {data}")
-            print(f"{'='*60}\n")
+            logger.debug("Extract API response (%d): %s", response.status_code, data)
             
             job_id = data.get("job_id")
             status = data.get("status")
@@ -78,15 +87,15 @@ class AIPipeline:
             if not job_id:
                 raise Exception("No job_id returned from extract API")
             
-            logger.info(f"Extract API returned job_id: {job_id}, status: {status}")
+            logger.info("Extract API returned job_id: %s, status: %s", job_id, status)
             return job_id
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Extract API call failed: {e}")
+            logger.error("Extract API call failed: %s", e)
             raise Exception(f"Failed to call extract API: {str(e)}")
 
     @staticmethod
-    def poll_job_status(job_id: str) -> str:
+    async def poll_job_status(job_id: str) -> str:
         """
         Poll the job status API until completion.
         
@@ -102,17 +111,15 @@ class AIPipeline:
             Exception: If polling times out or API fails
         """
         attempt = 0
+        deadline = time.monotonic() + AIPipeline.MAX_POLL_WAIT
         
-        while attempt < AIPipeline.MAX_POLL_ATTEMPTS:
+        while time.monotonic() < deadline:
             try:
                 params = {"job_id": job_id}
-                print(f"\n⏳ POLLING JOB STATUS (Attempt {attempt + 1}/{AIPipeline.MAX_POLL_ATTEMPTS})")
-                print(f"Endpoint: {AIPipeline.JOB_STATUS_ENDPOINT}")
-                print(f"Job ID: {job_id}")
-                
-                logger.info(f"Polling job status (attempt {attempt + 1}/{AIPipeline.MAX_POLL_ATTEMPTS})...")
+                logger.info("Polling job status for %s (attempt %d)...", job_id, attempt + 1)
                 
-                response = requests.get(
+                response = await asyncio.to_thread(
+                    AIPipeline._session.get,
                     AIPipeline.JOB_STATUS_ENDPOINT,
                     params=params,
                     timeout=AIPipeline.REQUEST_TIMEOUT
@@ -122,12 +129,8 @@ class AIPipeline:
                 data = response.json()
                 status = data.get("status")
                 
-                print(f"📥 JOB STATUS RESPONSE")
-                print(f"Status Code: {response.status_code}")
-                print(f"Job Status: {status}")
-                print(f"Full Response: {data}")
-                
-                logger.info(f"Job status: {status}")
+                logger.info("Job status: %s", status)
+                logger.debug("Job status response (%d): %s", response.status_code, data)
                 
                 if status == "completed":
                     result = data.get("result", {})
@@ -143,17 +146,33 @@ class AIPipeline:
                     error_message = data.get("error", "Unknown error")
                     raise Exception(f"Job failed: {error_message}")
                 
-                # Status is 'processing', wait and retry
-                time.sleep(AIPipeline.POLL_INTERVAL)
+                # Status is 'processing', back off exponentially and retry
+                # without blocking other requests
+                delay = AIPipeline.poll_delay(attempt)
+                await asyncio.sleep(min(delay, max(0, deadline - time.monotonic())))
                 attempt += 1
                 
             except requests.exceptions.RequestException as e:
-                logger.error(f"Job status API call failed: {e}")
+                logger.error("Job status API call failed: %s", e)
                 raise Exception(f"Failed to poll job status: {str(e)}")
         
-        # Polling timed out after MAX_POLL_ATTEMPTS (120 attempts)
-        logger.error(f"Job polling timed out after {AIPipeline.MAX_POLL_ATTEMPTS} attempts ({AIPipeline.MAX_POLL_ATTEMPTS * AIPipeline.POLL_INTERVAL} seconds)")
-        raise TimeoutError(f"Job polling timed out after {AIPipeline.MAX_POLL_ATTEMPTS} attempts")
+        # Polling timed out after MAX_POLL_WAIT (10 minutes)
+        logger.error("Job polling timed out after %d seconds (%d attempts)", AIPipeline.MAX_POLL_WAIT, attempt)
+        raise TimeoutError(f"Job polling timed out after {AIPipeline.MAX_POLL_WAIT} seconds")
+
+    @staticmethod
+    def poll_delay(attempt: int) -> float:
+        """
+        Get the delay before the next status poll.
+        
+        Args:
+            attempt: Zero-based number of polls made so far
+            
+        Returns:
+            Delay in seconds, exponential in attempt and capped at POLL_MAX_DELAY
+        """
+        delay = min(AIPipeline.POLL_MAX_DELAY, AIPipeline.POLL_INITIAL_DELAY * 2 ** min(attempt, 5))
+        return delay + random.uniform(0, AIPipeline.POLL_JITTER)
 
     @staticmethod
     def build_clinical_data_from_s3_keys(s3_keys_by_doc: Dict[int, List[str]]) -> Dict[str, List[str]]:
@@ -176,5 +195,5 @@ class AIPipeline:
             key = str(doc_index + 1)
             clinical_data[key] = s3_keys
         
-        logger.info(f"Built clinical_data with {len(clinical_data)} documents")
+        logger.info("Built clinical_data with %d documents", len(clinical_data))
         return clinical_data
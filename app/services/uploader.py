@@ -1,17 +1,55 @@
 """
 S3 uploader service for uploading JPEG images to AWS S3 using pre-signed URLs.
 """
+import asyncio
+import orjson
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bytes read from an image file and written to the socket per send call
+UPLOAD_BLOCK_SIZE = 1024 * 1024  # 1 MiB
+
+
+class _LargeBlockAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections send file bodies in UPLOAD_BLOCK_SIZE blocks"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        # http.client streams file bodies in 8-16 KiB blocks by default, i.e.
+        # one read() and one sendall() per block; bigger blocks cut the
+        # syscalls per upload by ~64x
+        kwargs["blocksize"] = UPLOAD_BLOCK_SIZE
+        super().init_poolmanager(*args, **kwargs)
+
 
 class S3Uploader:
     """Handles S3 uploads using pre-signed URLs"""
 
+    # Configuration
+    POOL_SIZE = 32  # keep-alive connections kept per host
+
+    # Shared HTTP session so upload URL requests and uploads reuse pooled
+    # keep-alive connections (one pool per host) instead of a new TLS
+    # handshake per call
+    _session = requests.Session()
+    _session.mount("https://", _LargeBlockAdapter(
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        # Transient S3/API errors are retried here (PUTs are idempotent)
+        # rather than failing the whole case
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+    ))
+
+    # Threads that carry async uploads, shared by every batch and request in
+    # this process so in-flight PUTs are bounded by the connection pool size
+    _executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="s3-upload")
+
     def __init__(self):
         """Initialize S3 uploader"""
         pass
@@ -36,18 +74,17 @@ class S3Uploader:
         payload = {"data": image_filenames}
         
         try:
-            print(f"\n{'='*60}")
-            print("📤 CALLING GET-UPLOAD-URLS API")
-            print(f"{'='*60}")
-            print(f"Endpoint: {api_endpoint}")
-            print(f"Image Filenames: {image_filenames}")
+            logger.debug("Requesting upload URLs from %s for %s", api_endpoint, image_filenames)
             
-            response = requests.post(api_endpoint, json=payload, timeout=30)
+            response = S3Uploader._session.post(
+                api_endpoint,
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=30
+            )
             response.raise_for_status()
             
-            data = response.json()
-            print(f"\n📥 GET-UPLOAD-URLS API RESPONSE")
-            print(f"Status Code: {response.status_code}")
+            data = orjson.loads(response.content)
             
             # Parse the response structure
             upload_urls = {}
@@ -55,83 +92,70 @@ class S3Uploader:
             
             # Extract data from nested structure: uploads -> data -> [array of items]
             uploads_section = data.get("uploads", {})
-            print(f"Uploads Section Keys: {uploads_section.keys()}")
-            
             uploads_data = uploads_section.get("data", [])
-            print(f"Number of items in uploads.data: {len(uploads_data)}")
+            logger.debug("Get-upload-urls API returned %d item(s) (%d)", len(uploads_data), response.status_code)
             
             for upload_item in uploads_data:
                 original_name = upload_item.get("original_name")
                 upload_url = upload_item.get("upload_url")
                 s3_key = upload_item.get("s3_key")
                 
-                print(f"\n✓ Parsing: {original_name}")
-                print(f"  S3 Key: {s3_key}")
-                print(f"  URL Length: {len(upload_url) if upload_url else 0}")
-                
                 if original_name and upload_url:
                     upload_urls[original_name] = upload_url
                     s3_keys[original_name] = s3_key
                 else:
-                    print(f"  ⚠ Missing URL or name!")
-            
-            print(f"\n📊 EXTRACTION SUMMARY")
-            print(f"Total URLs extracted: {len(upload_urls)}")
-            print(f"Files with URLs:")
-            for filename in sorted(upload_urls.keys()):
-                print(f"   ✓ {filename}")
+                    logger.warning("Upload item missing URL or name: %s", original_name)
             
-            print(f"{'='*60}\n")
-            
-            logger.info(f"Got {len(upload_urls)} upload URLs from API")
+            logger.info("Got %d upload URLs from API", len(upload_urls))
             return upload_urls, s3_keys
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error getting upload URLs: {e}")
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            logger.error("Error getting upload URLs: %s", e)
             raise Exception(f"Failed to get upload URLs: {str(e)}")
 
     @staticmethod
-    def upload_image_to_s3(image_path: Path, upload_url: str) -> bool:
+    def upload_image_to_s3(image_path: Path, upload_url: str, session: Optional[requests.Session] = None) -> bool:
         """
         Upload a single JPEG image to S3 using the provided pre-signed URL.
         
         Args:
             image_path: Path to the JPEG image file
             upload_url: Pre-signed S3 upload URL
+            session: Session to send the request with (default: the shared session)
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            print(f"\n🔄 UPLOADING TO S3: {image_path.name}")
-            print(f"File size: {image_path.stat().st_size} bytes")
+            file_size = image_path.stat().st_size
+            logger.debug("Uploading %s (%d bytes)", image_path.name, file_size)
             
-            with open(image_path, "rb") as f:
-                image_data = f.read()
-            
-            headers = {"Content-Type": "image/jpeg"}
+            # Stream the file instead of reading it into memory; an explicit
+            # Content-Length keeps requests from using chunked transfer
+            # encoding, which pre-signed S3 PUTs reject
+            headers = {
+                "Content-Type": "image/jpeg",
+                "Content-Length": str(file_size)
+            }
             
-            response = requests.put(upload_url, data=image_data, headers=headers, timeout=30)
+            with open(image_path, "rb") as f:
+                response = (session or S3Uploader._session).put(upload_url, data=f, headers=headers, timeout=30)
             response.raise_for_status()
             
-            print(f"✅ S3 UPLOAD SUCCESS")
-            print(f"Status Code: {response.status_code}")
-            print(f"File: {image_path.name}")
-            
-            logger.info(f"Successfully uploaded {image_path.name} to S3")
+            logger.info("Successfully uploaded %s to S3", image_path.name)
             return True
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Error uploading {image_path.name} to S3: {e}")
+            logger.error("Error uploading %s to S3: %s", image_path.name, e)
             return False
         except Exception as e:
-            logger.error(f"Unexpected error uploading {image_path.name}: {e}")
+            logger.error("Unexpected error uploading %s: %s", image_path.name, e)
             return False
 
     @staticmethod
     def upload_all_images(image_paths: List[Path], upload_urls: Dict[str, str], s3_keys: Dict[str, str]) -> Dict[str, str]:
         """
-        Upload all images to S3.
+        Upload all images to S3 in parallel, from synchronous code.
         
         Args:
             image_paths: List of Path objects for JPEG images
@@ -144,29 +168,97 @@ class S3Uploader:
         Raises:
             Exception: If any upload fails
         """
-        s3_keys_mapping = {}
-        failed_uploads = []
+        # Same upload loop as the async path, on the shared upload thread
+        # pool; not for use from inside a running event loop
+        return asyncio.run(S3Uploader.upload_all_images_async(image_paths, upload_urls, s3_keys))
+
+    @staticmethod
+    def _check_upload_urls(image_paths: List[Path], upload_urls: Dict[str, str]) -> None:
+        """
+        Make sure every image has an upload URL before any upload starts.
         
-        for image_path in image_paths:
-            filename = image_path.name
-            
-            if filename not in upload_urls:
-                logger.warning(f"No upload URL for {filename}")
-                failed_uploads.append(filename)
-                continue
+        Args:
+            image_paths: List of Path objects for JPEG images
+            upload_urls: Dictionary mapping filename to upload URL
             
-            upload_url = upload_urls[filename]
-            s3_key = s3_keys.get(filename, "")
+        Raises:
+            Exception: If any image has no upload URL
+        """
+        missing = [image_path.name for image_path in image_paths if image_path.name not in upload_urls]
+        if missing:
+            logger.warning("No upload URL for %s", ", ".join(missing))
+            raise Exception(f"Failed to upload images: {', '.join(missing)}")
+
+    @staticmethod
+    async def upload_all_images_async(image_paths: List[Path], upload_urls: Dict[str, str], s3_keys: Dict[str, str]) -> Dict[str, str]:
+        """
+        Upload all images to S3 concurrently.
+        
+        Each upload runs on the shared upload thread pool, so up to
+        POOL_SIZE PUT requests are in flight at once across all callers,
+        each on a pooled keep-alive connection, without blocking the
+        event loop.
+        
+        Args:
+            image_paths: List of Path objects for JPEG images
+            upload_urls: Dictionary mapping filename to upload URL
+            s3_keys: Dictionary mapping filename to S3 key
             
-            # Upload the image
-            success = S3Uploader.upload_image_to_s3(image_path, upload_url)
+        Returns:
+            Dictionary mapping filename to S3 key
             
-            if success:
-                s3_keys_mapping[filename] = s3_key
-            else:
-                failed_uploads.append(filename)
+        Raises:
+            Exception: If any upload fails
+        """
+        loop = asyncio.get_running_loop()
+
+        def upload_one(image_path: Path) -> asyncio.Future:
+            return loop.run_in_executor(
+                S3Uploader._executor,
+                S3Uploader.upload_image_to_s3,
+                image_path,
+                upload_urls[image_path.name]
+            )
+
+        S3Uploader._check_upload_urls(image_paths, upload_urls)
+        s3_keys_mapping = {}
+        futures = {upload_one(image_path): image_path.name for image_path in image_paths}
+        pending = set(futures)
         
-        if failed_uploads:
-            raise Exception(f"Failed to upload images: {', '.join(failed_uploads)}")
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    filename = futures[future]
+                    if not future.result():
+                        # The session already retried transient errors; this
+                        # batch is doomed, so stop the uploads not yet started
+                        raise Exception(f"Failed to upload images: {filename}")
+                    s3_keys_mapping[filename] = s3_keys.get(filename, "")
+        finally:
+            for future in pending:
+                future.cancel()
         
         return s3_keys_mapping
+
+    @staticmethod
+    async def upload_images_async(image_paths: List[Path], api_endpoint: str) -> Dict[str, str]:
+        """
+        Request upload URLs for a batch of images, then upload them.
+        
+        Args:
+            image_paths: List of Path objects for JPEG images
+            api_endpoint: API endpoint URL for getting upload URLs
+            
+        Returns:
+            Dictionary mapping filename to S3 key
+            
+        Raises:
+            Exception: If getting upload URLs or any upload fails
+        """
+        upload_urls, s3_keys = await asyncio.to_thread(
+            S3Uploader.get_upload_urls,
+            [image_path.name for image_path in image_paths],
+            api_endpoint
+        )
+        return await S3Uploader.upload_all_images_async(image_paths, upload_urls, s3_keys)
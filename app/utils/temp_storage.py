@@ -1,12 +1,20 @@
 """
 Temporary storage utilities for managing uploaded files and converted images.
 """
+import logging
 import os
 import shutil
 from pathlib import Path
 from typing import List
 import uuid
 
+from fastapi import UploadFile
+
+# Size of each chunk read from an upload while streaming it to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+logger = logging.getLogger(__name__)
+
 
 class TempStorage:
     """Manages temporary file storage for document processing"""
@@ -54,13 +62,17 @@ class TempStorage:
             path = path / subdir
         return path
 
-    def save_uploaded_file(self, request_id: str, file_content: bytes, filename: str) -> Path:
+    async def save_uploaded_file(self, request_id: str, file: UploadFile, filename: str) -> Path:
         """
-        Save an uploaded file to the raw subdirectory.
+        Stream an uploaded file to the raw subdirectory.
+        
+        The body is copied in UPLOAD_CHUNK_SIZE chunks so memory stays
+        bounded regardless of the file size, and written with os.write so
+        each chunk is copied once.
         
         Args:
             request_id: The request ID
-            file_content: Binary content of the file
+            file: The uploaded file
             filename: Original filename
             
         Returns:
@@ -69,8 +81,17 @@ class TempStorage:
         raw_dir = self.get_request_path(request_id, "raw")
         file_path = raw_dir / filename
         
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        # Write each chunk straight to the file descriptor, with no Python
+        # buffer layer copying it again; os.write may write less than asked,
+        # so keep going until the whole chunk is on disk
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                view = memoryview(chunk)
+                while view:
+                    view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
         
         return file_path
 
@@ -84,10 +105,7 @@ class TempStorage:
         Returns:
             List of Path objects
         """
-        raw_dir = self.get_request_path(request_id, "raw")
-        if not raw_dir.exists():
-            return []
-        return sorted(raw_dir.glob("*"))
+        return self._list_files(self.get_request_path(request_id, "raw"))
 
     def get_converted_images(self, request_id: str) -> List[Path]:
         """
@@ -99,14 +117,36 @@ class TempStorage:
         Returns:
             List of Path objects, sorted for consistent ordering
         """
-        converted_dir = self.get_request_path(request_id, "converted")
-        if not converted_dir.exists():
-            return []
-        
         # Get all JPEG files and sort them
         # Sorting ensures consistent ordering even after conversion
-        jpegs = sorted(converted_dir.glob("*.jpeg"))
-        return jpegs
+        return self._list_files(self.get_request_path(request_id, "converted"), ".jpeg")
+
+    @staticmethod
+    def _list_files(directory: Path, suffix: str = "") -> List[Path]:
+        """
+        List the files in a directory, sorted by name.
+        
+        Uses os.scandir, whose entries carry their file type, so no
+        extra stat() call is made per file. A missing directory yields an
+        empty list rather than being probed with exists() first.
+        
+        Args:
+            directory: Directory to list
+            suffix: Only include names ending with this suffix
+            
+        Returns:
+            List of Path objects
+        """
+        try:
+            with os.scandir(directory) as entries:
+                names = [
+                    entry.name for entry in entries
+                    if entry.name.endswith(suffix) and entry.is_file(follow_symlinks=False)
+                ]
+        except FileNotFoundError:
+            return []
+        names.sort()
+        return [directory / name for name in names]
 
     def cleanup_request(self, request_id: str) -> bool:
         """
@@ -124,7 +164,7 @@ class TempStorage:
                 shutil.rmtree(request_dir)
                 return True
             except Exception as e:
-                print(f"Error cleaning up request {request_id}: {e}")
+                logger.error("Error cleaning up request %s: %s", request_id, e)
                 return False
         return True
 
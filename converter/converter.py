@@ -1,25 +1,77 @@
 import fitz  # PyMuPDF
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from PIL import Image
 import io
 import os
+import shutil
 
-def convert_image_to_jpeg(input_path, output_folder):
+# Image formats
+IMAGE_FORMATS = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.tif', 
+                 '.webp', '.ico', '.ppm', '.pgm', '.pbm', '.pnm', '.dib'}
+
+# Image formats that are already JPEG and need no conversion
+JPEG_FORMATS = {'.jpg', '.jpeg'}
+
+# Document formats that PyMuPDF can handle
+DOCUMENT_FORMATS = {'.pdf', '.xps', '.epub', '.mobi', '.fb2', '.cbz', 
+                    '.svg', '.txt'}
+
+# Microsoft Office formats (PyMuPDF 1.19+ can handle these)
+OFFICE_FORMATS = {'.docx', '.doc', '.pptx', '.ppt', '.xlsx', '.xls'}
+
+def count_pages(input_path):
+    """Count the JPEG images universal_to_jpeg will write for a file"""
+    input_path = Path(input_path)
+    
+    if input_path.suffix.lower() in IMAGE_FORMATS:
+        return 1
+    
+    try:
+        doc = fitz.open(input_path)
+        page_count = len(doc)
+        doc.close()
+        return page_count
+    except Exception:
+        # Unknown formats fall back to a single image conversion
+        return 1
+
+def output_name(input_path, page_index, name_prefix=None):
+    """Name of the JPEG written for one page (1-based page_index)"""
+    if name_prefix is not None:
+        return f"{name_prefix}{page_index}.jpeg"
+    return f"{input_path.stem}_page_{page_index}.jpeg"
+
+def flatten_to_rgb(img):
+    """Convert an image to RGB, compositing any transparency onto white"""
+    if img.mode == 'P':
+        # Only palettes with a transparent colour need the alpha path
+        img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+    
+    if img.mode in ('RGBA', 'LA'):
+        # Pillow reads the alpha band straight from an RGBA/LA mask,
+        # so no separate split() copy of the alpha channel is needed
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img)
+        return background
+    
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+def convert_image_to_jpeg(input_path, output_folder, name_prefix=None, start_index=1):
     """Convert image files (PNG, BMP, GIF, TIFF, WEBP, etc.) to JPEG"""
     try:
         img = Image.open(input_path)
         
         # Convert RGBA to RGB if needed
-        if img.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-            img = background
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
+        img = flatten_to_rgb(img)
         
-        output_path = output_folder / f"{input_path.stem}.jpeg"
+        if name_prefix is not None:
+            output_path = output_folder / output_name(input_path, start_index, name_prefix)
+        else:
+            output_path = output_folder / f"{input_path.stem}.jpeg"
         img.save(output_path, "JPEG", quality=95)
         print(f"Saved: {output_path.name}")
         return True
@@ -27,56 +79,104 @@ def convert_image_to_jpeg(input_path, output_folder):
         print(f"Error converting image: {e}")
         return False
 
-def convert_pdf_to_jpeg(input_path, output_folder, dpi=300):
+# JPEG quality for rendered document pages
+PAGE_JPEG_QUALITY = 90
+
+def render_pages(input_path, output_folder, page_nums, dpi=300, name_prefix=None, start_index=1):
+    """Render the given pages of a PyMuPDF document to JPEG images"""
+    doc = fitz.open(input_path)
+    zoom = dpi / 72
+    mat = fitz.Matrix(zoom, zoom)
+    
+    for page_num in page_nums:
+        page = doc[page_num]
+        pix = page.get_pixmap(matrix=mat)
+        
+        # Encode in memory and write the file in one go
+        output_filename = output_name(input_path, start_index + page_num, name_prefix)
+        output_path = output_folder / output_filename
+        output_path.write_bytes(pix.tobytes("jpeg", jpg_quality=PAGE_JPEG_QUALITY))
+        print(f"Saved: {output_filename}")
+    
+    doc.close()
+
+def render_all_pages(input_path, output_folder, page_count, dpi=300, name_prefix=None, start_index=1, max_workers=None):
+    """Render every page, spread across max_workers processes (default: all in this process)"""
+    workers = min(max_workers or 1, page_count)
+    
+    if workers <= 1:
+        render_pages(input_path, output_folder, range(page_count), dpi, name_prefix, start_index)
+        return
+    
+    # Each worker opens its own copy of the document and renders every n-th page
+    render = partial(render_pages, input_path, output_folder, dpi=dpi,
+                     name_prefix=name_prefix, start_index=start_index)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(render, [range(i, page_count, workers) for i in range(workers)]))
+
+def is_plain_jpeg(input_path):
+    """Check that a file really is an RGB or greyscale JPEG without metadata that can be used as-is"""
+    try:
+        # Image.open only parses the header, the pixels are not decoded
+        with Image.open(input_path) as img:
+            if img.format != 'JPEG' or img.mode not in ('RGB', 'L'):
+                return False
+            # APP1 holds EXIF (GPS location, device data, orientation) and
+            # XMP; re-encoding drops it, so only files without it pass through
+            return not any(marker == 'APP1' for marker, _ in img.applist)
+    except Exception:
+        return False
+
+def copy_jpeg(input_path, output_folder, name_prefix=None, start_index=1):
+    """Place an already-JPEG file in the output folder without re-encoding"""
+    try:
+        if name_prefix is not None:
+            output_path = output_folder / output_name(input_path, start_index, name_prefix)
+        else:
+            output_path = output_folder / f"{input_path.stem}.jpeg"
+        
+        try:
+            # Hard link is O(1) on the same filesystem
+            os.link(input_path, output_path)
+        except OSError:
+            # Different filesystem (EXDEV) or links unsupported: plain copy
+            shutil.copyfile(input_path, output_path)
+        print(f"Saved: {output_path.name}")
+        return True
+    except Exception as e:
+        print(f"Error copying JPEG: {e}")
+        return False
+
+def convert_pdf_to_jpeg(input_path, output_folder, dpi=300, name_prefix=None, start_index=1, max_workers=None):
     """Convert PDF pages to JPEG images"""
     try:
         pdf_doc = fitz.open(input_path)
-        print(f"Converting {len(pdf_doc)} pages from PDF...")
-        
-        for page_num in range(len(pdf_doc)):
-            page = pdf_doc[page_num]
-            zoom = dpi / 72
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat)
-            
-            output_filename = f"{input_path.stem}_page_{page_num + 1}.jpeg"
-            output_path = output_folder / output_filename
-            pix.save(output_path, "jpeg")
-            print(f"Saved: {output_filename}")
-        
         total_pages = len(pdf_doc)
         pdf_doc.close()
+        print(f"Converting {total_pages} pages from PDF...")
+        
+        render_all_pages(input_path, output_folder, total_pages, dpi, name_prefix, start_index, max_workers)
         return True
     except Exception as e:
         print(f"Error converting PDF: {e}")
         return False
 
-def convert_document_to_jpeg(input_path, output_folder, dpi=300):
+def convert_document_to_jpeg(input_path, output_folder, dpi=300, name_prefix=None, start_index=1, max_workers=None):
     """Convert document files (DOCX, DOC, PPT, PPTX, XLS, XLSX) to JPEG using PyMuPDF"""
     try:
         # PyMuPDF can open many document formats directly
         doc = fitz.open(input_path)
-        print(f"Converting {len(doc)} pages from document...")
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            zoom = dpi / 72
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat)
-            
-            output_filename = f"{input_path.stem}_page_{page_num + 1}.jpeg"
-            output_path = output_folder / output_filename
-            pix.save(output_path, "jpeg")
-            print(f"Saved: {output_filename}")
-        
         total_pages = len(doc)
         doc.close()
+        print(f"Converting {total_pages} pages from document...")
+        
+        render_all_pages(input_path, output_folder, total_pages, dpi, name_prefix, start_index, max_workers)
         return True
     except Exception as e:
         print(f"Error converting document: {e}")
         return False
 
-def convert_svg_to_jpeg(input_path, output_folder):
+def convert_svg_to_jpeg(input_path, output_folder, name_prefix=None, start_index=1):
     """Convert SVG to JPEG"""
     try:
         from cairosvg import svg2png
@@ -85,14 +185,12 @@ def convert_svg_to_jpeg(input_path, output_folder):
         png_data = svg2png(url=str(input_path))
         img = Image.open(io.BytesIO(png_data))
         
-        if img.mode in ('RGBA', 'LA'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[-1])
-            img = background
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
+        img = flatten_to_rgb(img)
         
-        output_path = output_folder / f"{input_path.stem}.jpeg"
+        if name_prefix is not None:
+            output_path = output_folder / output_name(input_path, start_index, name_prefix)
+        else:
+            output_path = output_folder / f"{input_path.stem}.jpeg"
         img.save(output_path, "JPEG", quality=95)
         print(f"Saved: {output_path.name}")
         return True
@@ -103,7 +201,7 @@ def convert_svg_to_jpeg(input_path, output_folder):
         print(f"Error converting SVG: {e}")
         return False
 
-def universal_to_jpeg(input_path, output_folder=None, dpi=300):
+def universal_to_jpeg(input_path, output_folder=None, dpi=300, name_prefix=None, start_index=1, max_workers=None):
     """
     Convert any file format to JPEG.
     
@@ -111,6 +209,12 @@ def universal_to_jpeg(input_path, output_folder=None, dpi=300):
         input_path: Path to the input file
         output_folder: Folder to save JPEG images (default: same as input location)
         dpi: Resolution for document conversions (default: 300)
+        name_prefix: If given, pages are written as {name_prefix}{n}.jpeg
+                     instead of being named after the input file
+        start_index: Number of the first page when name_prefix is given (default: 1)
+        max_workers: Processes used to render pages of multi-page documents
+                     (default: 1, render in this process; keep it so when
+                     called from a worker process)
     """
     input_path = Path(input_path)
     
@@ -132,40 +236,32 @@ def universal_to_jpeg(input_path, output_folder=None, dpi=300):
     print(f"\nProcessing: {input_path.name}")
     print(f"Output folder: {output_folder}\n")
     
-    # Image formats
-    image_formats = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.tif', 
-                    '.webp', '.ico', '.ppm', '.pgm', '.pbm', '.pnm', '.dib'}
-    
-    # Document formats that PyMuPDF can handle
-    document_formats = {'.pdf', '.xps', '.epub', '.mobi', '.fb2', '.cbz', 
-                       '.svg', '.txt'}
-    
-    # Microsoft Office formats (PyMuPDF 1.19+ can handle these)
-    office_formats = {'.docx', '.doc', '.pptx', '.ppt', '.xlsx', '.xls'}
-    
     success = False
     
-    if ext in image_formats:
-        success = convert_image_to_jpeg(input_path, output_folder)
+    if ext in JPEG_FORMATS and is_plain_jpeg(input_path):
+        success = copy_jpeg(input_path, output_folder, name_prefix, start_index)
+    
+    elif ext in IMAGE_FORMATS:
+        success = convert_image_to_jpeg(input_path, output_folder, name_prefix, start_index)
     
     elif ext == '.pdf':
-        success = convert_pdf_to_jpeg(input_path, output_folder, dpi)
+        success = convert_pdf_to_jpeg(input_path, output_folder, dpi, name_prefix, start_index, max_workers)
     
-    elif ext in document_formats or ext in office_formats:
-        success = convert_document_to_jpeg(input_path, output_folder, dpi)
+    elif ext in DOCUMENT_FORMATS or ext in OFFICE_FORMATS:
+        success = convert_document_to_jpeg(input_path, output_folder, dpi, name_prefix, start_index, max_workers)
     
     elif ext == '.svg':
-        success = convert_svg_to_jpeg(input_path, output_folder)
+        success = convert_svg_to_jpeg(input_path, output_folder, name_prefix, start_index)
     
     else:
         # Try as image first
         print(f"Unknown format '{ext}', trying as image...")
-        success = convert_image_to_jpeg(input_path, output_folder)
+        success = convert_image_to_jpeg(input_path, output_folder, name_prefix, start_index)
         
         if not success:
             # Try as document
             print(f"Trying as document...")
-            success = convert_document_to_jpeg(input_path, output_folder, dpi)
+            success = convert_document_to_jpeg(input_path, output_folder, dpi, name_prefix, start_index, max_workers)
     
     if success:
         print(f"\n✓ Conversion complete! Check {output_folder}")
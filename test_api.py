@@ -24,26 +24,34 @@ def test_process_case():
     for f in files_to_send:
         print(f"   - {f.name}")
     
-    # Prepare files for upload
-    files = []
-    for file_path in files_to_send:
-        with open(file_path, "rb") as f:
-            files.append(("files", (file_path.name, f, "application/octet-stream")))
+    try:
+        from requests_toolbelt.multipart.encoder import MultipartEncoder
+    except ImportError:
+        MultipartEncoder = None
+        print("ℹ️  requests-toolbelt not installed, building the request in memory")
+        print("   Install with: pip install requests-toolbelt to stream it instead")
     
+    file_objects = []
     try:
         print("\n🚀 Sending request to backend...")
         
-        # Open files and send
-        with open(files_to_send[0], "rb") as f1:
-            file_objects = []
-            for file_path in files_to_send:
-                file_objects.append(("files", open(file_path, "rb")))
-            
-            response = requests.post(API_URL, files=file_objects, timeout=300)
-            
-            # Close all files
-            for _, f in file_objects:
-                f.close()
+        file_objects = [open(file_path, "rb") for file_path in files_to_send]
+        fields = [
+            ("files", (file_path.name, f, "application/octet-stream"))
+            for file_path, f in zip(files_to_send, file_objects)
+        ]
+        
+        if MultipartEncoder is not None:
+            # Stream the multipart body from disk instead of building it in memory
+            encoder = MultipartEncoder(fields=fields)
+            response = requests.post(
+                API_URL,
+                data=encoder,
+                headers={"Content-Type": encoder.content_type},
+                timeout=300
+            )
+        else:
+            response = requests.post(API_URL, files=fields, timeout=300)
         
         if response.status_code == 200:
             result = response.json()
@@ -63,6 +71,10 @@ def test_process_case():
         print("   Run: uvicorn app.main:app --reload")
     except Exception as e:
         print(f"❌ Error: {e}")
+    finally:
+        # Close all files
+        for f in file_objects:
+            f.close()
 
 
 if __name__ == "__main__":